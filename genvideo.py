@@ -13,6 +13,8 @@ Alur kerja:
 Dependensi:
 - requests
 - moviepy==1.0.3
+- Pillow (render subtitle)
+- orjson (opsional, parsing JSON lebih cepat)
 - openai-whisper (CLI, bukan modul Python)
 
 Contoh Penggunaan:
@@ -21,29 +23,48 @@ python genvideo.py -i
 
 # Penggunaan Lanjutan dengan Kustomisasi Penuh
 python genvideo.py "A journey through a cyberpunk city at night" --use_whisper --use_gpu --music "path/to/your/music.mp3" --highlight_color "#00FFFF" --subtitle_position center
+
+# Render cepat: tiap bagian video di-encode ffmpeg (paralel) lalu digabung tanpa encode ulang
+python genvideo.py "Petualangan kucing di Mars" --fast_render
 """
 import argparse
+import functools
+import hashlib
 import json
+import multiprocessing
 import os
 import random
 import re
+import shutil
 import sys
+import threading
 import time
+import numpy as np
 import requests
 import subprocess
+import urllib3
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from urllib.parse import quote
 from pathlib import Path
+from PIL import Image, ImageDraw, ImageFont
 from moviepy.editor import (
+    VideoClip,
     VideoFileClip,
     AudioFileClip,
     ImageClip,
-    TextClip,
     CompositeVideoClip,
     concatenate_videoclips,
-    CompositeAudioClip,
 )
 from moviepy.video.fx.all import fadein, fadeout
-import moviepy.audio.fx.all as afx
+from moviepy.config import get_setting
+
+try:
+    import orjson
+except ImportError:  # orjson opsional; fallback ke modul json standar
+    orjson = None
 
 # --- KONFIGURASI URL ENDPOINT ---
 URL_STORY = "https://text.pollinations.ai/{prompt}?model=openai&json=true"
@@ -52,16 +73,70 @@ URL_AUDIO = "https://text.pollinations.ai/{prompt}?model=openai-audio&voice=nova
 URL_FONT = "https://cdn.jsdelivr.net/fontsource/fonts/{id}@latest/latin-700-normal.ttf"
 
 DEFAULT_SEED = 5000
+MUSIC_VOLUME = 0.15
+PADDING_DURATION = 5
+SUBTITLE_POSITIONS = {'bottom': ('center', 0.8), 'center': ('center', 'center'), 'top': ('center', 0.1)}
+KEN_BURNS_ZOOM = 0.2
+VIDEO_FPS = 24
 MAX_RETRIES = 3
+DOWNLOAD_WORKERS = 8
+REQUEST_TIMEOUT = (5, 60)  # (connect, read): gagal cepat saat koneksi, sabar menunggu generator AI
+DOWNLOAD_CHUNK_SIZE = 1 << 20  # 1MB: aset kecil (gambar/narasi) cukup ditulis dalam 1-2 potongan
 SEPARATOR = "=" * 50
 
+# Satu session bersama agar koneksi TCP+TLS ke pollinations.ai dipakai ulang antar unduhan.
+# Coba-ulang (error koneksi & status sementara) diserahkan ke urllib3 dengan backoff eksponensial.
+SESSION = requests.Session()
+_ADAPTER = HTTPAdapter(
+    pool_connections=DOWNLOAD_WORKERS,
+    pool_maxsize=DOWNLOAD_WORKERS,
+    max_retries=Retry(total=MAX_RETRIES, backoff_factor=1.0, status_forcelist=[429, 500, 502, 503, 504]),
+)
+SESSION.mount("https://", _ADAPTER)
+SESSION.mount("http://", _ADAPTER)
+
 # --- FUNGSI HELPER ---
 
+def parse_json(data):
+    """Mem-parse JSON dari bytes/str, memakai orjson jika tersedia."""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def load_json(path):
+    """Membaca file JSON (cerita, output Whisper)."""
+    return parse_json(Path(path).read_bytes())
+
+
+def save_json(path, data):
+    """Menulis JSON UTF-8 terindentasi, memakai orjson jika tersedia."""
+    if orjson is not None:
+        Path(path).write_bytes(orjson.dumps(data, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS))
+        return
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False, indent=4)
+
+
+# Judul ASCII (kasus umum) cukup satu bytes.translate: huruf besar jadi kecil,
+# whitespace jadi spasi, karakter di luar a-z/0-9/'-' dibuang.
+_SLUG_BYTES = bytes(ord(chr(i).lower()) if chr(i).isalnum() or chr(i) == "-" else 32 for i in range(128)) + bytes(range(128, 256))
+_SLUG_DROP = bytes(i for i in range(128) if not (chr(i).isalnum() or chr(i) == "-" or chr(i).isspace()))
+_SLUG_KEEP = re.compile(r"[^a-z0-9\s-]")
+_SLUG_COLLAPSE = re.compile(r"[\s-]+")
+
+
 def slugify(text):
-    text = text.lower()
-    text = re.sub(r"[^a-z0-9\s-]", "", text)
-    text = re.sub(r"[\s-]+", "-", text).strip("-")
-    return text
+    if text.isascii():
+        text = text.encode("ascii").translate(_SLUG_BYTES, _SLUG_DROP).decode("ascii")
+    else:
+        text = _SLUG_KEEP.sub("", text.lower())
+    return _SLUG_COLLAPSE.sub("-", text).strip("-")
+
+
+def cache_key(url):
+    """Nama file cache dari hash URL aset (prompt + seed), agar aset yang sama tidak diunduh ulang."""
+    return hashlib.sha256(url.encode("utf-8")).hexdigest()[:16]
 
 
 def setup_cache_directories(story_title):
@@ -76,36 +151,480 @@ def setup_cache_directories(story_title):
     return {"base": base_cache_path, "images": image_path, "audio": audio_path, "subtitles": subtitle_path}
 
 
+def preallocate(f, response):
+    """Memesan ruang disk sesuai Content-Length agar file tidak terfragmentasi (jika didukung)."""
+    length = response.headers.get("Content-Length")
+    # Dengan Content-Encoding, Content-Length adalah ukuran terkompresi, bukan ukuran file.
+    if not length or response.headers.get("Content-Encoding") or not hasattr(os, "posix_fallocate"):
+        return
+    try:
+        os.posix_fallocate(f.fileno(), 0, int(length))
+    except (OSError, ValueError):
+        pass
+
+
 def download_file(url, destination):
-    """Mengunduh file dengan logika coba-ulang (retry)."""
+    """Mengunduh file; retry koneksi & status ditangani SESSION, retry body yang terputus di sini."""
     if destination.exists():
         print(f"[INFO] File sudah ada: {destination.name}")
         return True
     
-    for attempt in range(MAX_RETRIES):
+    print(f"[>] Mengunduh {destination.name}...")
+    for attempt in range(MAX_RETRIES + 1):
         try:
-            print(f"[>] Mengunduh {destination.name} (Percobaan {attempt + 1}/{MAX_RETRIES})...")
             # Menambahkan timeout untuk mencegah hang
-            response = requests.get(url, stream=True, timeout=20)
-            response.raise_for_status()
-
-            with open(destination, "wb") as f:
-                for chunk in response.iter_content(chunk_size=8192):
-                    f.write(chunk)
+            with SESSION.get(url, stream=True, timeout=REQUEST_TIMEOUT) as response:
+                response.raise_for_status()
+                # Salin langsung dari stream urllib3 (gzip tetap didekode) tanpa iterator requests.
+                response.raw.decode_content = True
+                with open(destination, "wb", buffering=DOWNLOAD_CHUNK_SIZE) as f:
+                    preallocate(f, response)
+                    shutil.copyfileobj(response.raw, f, length=DOWNLOAD_CHUNK_SIZE)
             
             print(f"[SUCCESS] Berhasil mengunduh: {destination.name}")
-            return True # Berhasil, keluar dari fungsi
+            return True
+
+        except (urllib3.exceptions.ProtocolError, urllib3.exceptions.IncompleteRead, urllib3.exceptions.ReadTimeoutError) as e:
+            # Retry urllib3 hanya mencakup koneksi & header; body yang terputus dicoba ulang di sini.
+            # Hapus file parsial agar tidak dianggap cache yang valid pada run berikutnya.
+            destination.unlink(missing_ok=True)
+            if attempt == MAX_RETRIES:
+                print(f"[ERROR] Gagal mengunduh {destination.name} setelah {MAX_RETRIES} percobaan ulang: {e}")
+                return False
+            print(f"[WARN] Unduhan {destination.name} terputus, mencoba lagi ({attempt + 1}/{MAX_RETRIES}): {e}")
+            time.sleep(2 ** attempt)
+
+        except (requests.exceptions.RequestException, urllib3.exceptions.HTTPError) as e:
+            print(f"[ERROR] Gagal mengunduh {destination.name}: {e}")
+            destination.unlink(missing_ok=True)
+            return False
+
+
+def download_image(url, destination):
+    """Mengunduh gambar lalu langsung menyiapkan versi zoom-nya di thread unduhan yang sama."""
+    if not download_file(url, destination):
+        return False
+    try:
+        prescale_image(destination)
+        return True
+    except OSError as e:
+        print(f"[ERROR] Gambar {destination.name} tidak valid: {e}")
+        destination.unlink(missing_ok=True)
+        return False
+
+
+@functools.lru_cache(maxsize=8)
+def load_font(font_path, size):
+    """Memuat font TrueType sekali per (path, ukuran)."""
+    return ImageFont.truetype(str(font_path), size)
+
+
+@functools.lru_cache(maxsize=4096)
+def text_length(font_path, size, text):
+    """Lebar teks dalam piksel; baris kandidat saat wrap dan prefiks kata karaoke sering sama."""
+    return load_font(font_path, size).getlength(text)
+
+
+@functools.lru_cache(maxsize=None)
+def wrap_text(text, font_path, size, width_px):
+    """Memecah teks menjadi baris (greedy per kata) yang muat dalam width_px; di-cache per kalimat."""
+    lines, current = [], ""
+    for word in text.split():
+        candidate = f"{current} {word}" if current else word
+        if current and text_length(font_path, size, candidate) > width_px:
+            lines.append(current)
+            current = word
+        else:
+            current = candidate
+    if current:
+        lines.append(current)
+    return tuple(lines)
+
+
+@functools.lru_cache(maxsize=None)
+def render_caption(text, font_path, size, color, width_px, stroke_color=None, stroke_width=0):
+    """Merender teks rata tengah ke array RGBA dengan Pillow (tanpa ImageMagick)."""
+    font = load_font(font_path, size)
+    block = "\n".join(wrap_text(text, font_path, size, width_px))
+    spacing = size // 4
+    origin = (width_px / 2, stroke_width)
+    draw_kwargs = {"font": font, "anchor": "ma", "spacing": spacing, "align": "center", "stroke_width": stroke_width}
+    bbox = ImageDraw.Draw(Image.new("RGBA", (1, 1))).multiline_textbbox(origin, block, **draw_kwargs)
+    image = Image.new("RGBA", (width_px, int(bbox[3]) + stroke_width + 1), (0, 0, 0, 0))
+    ImageDraw.Draw(image).multiline_text(origin, block, fill=color, stroke_fill=stroke_color, **draw_kwargs)
+    return np.asarray(image)
+
+
+def make_text_clip(text, fontsize, font, color, width, stroke_color=None, stroke_width=0):
+    """Membungkus hasil render_caption (yang di-cache) menjadi ImageClip transparan."""
+    caption = render_caption(text, font, fontsize, color, int(width), stroke_color, int(round(stroke_width)))
+    return ImageClip(caption, transparent=True)
+
+
+def load_image_array(image_path):
+    """Membaca gambar sekali sebagai array RGB."""
+    with Image.open(image_path) as img:
+        return np.asarray(img.convert("RGB"))
+
+
+def prescale_image(image_path, zoom=KEN_BURNS_ZOOM):
+    """Menyimpan gambar yang diperbesar ke skala zoom maksimum Ken Burns (sekali, di-cache di disk)."""
+    image_path = Path(image_path)
+    zoomed_path = image_path.with_name(f"{image_path.stem}.zoom{round(zoom * 100)}.jpg")
+    if not zoomed_path.exists():
+        with Image.open(image_path) as img:
+            img = img.convert("RGB")
+            w, h = img.size
+            img.resize((round(w * (1 + zoom)), round(h * (1 + zoom))), Image.LANCZOS).save(zoomed_path, quality=92)
+    return zoomed_path
+
+
+@functools.lru_cache(maxsize=1)
+def load_zoomed_array(zoomed_path):
+    """Memuat gambar zoom sebagai array RGB; hanya gambar yang sedang tampil yang disimpan di memori."""
+    with Image.open(zoomed_path) as img:
+        return np.asarray(img.convert("RGB"))
+
+
+def make_ken_burns_clip(image_path, duration, zoom=KEN_BURNS_ZOOM):
+    """Membuat klip zoom-in (efek Ken Burns) berukuran tetap dari satu gambar.
+
+    Memakai gambar yang sudah diperbesar ke skala zoom maksimum (prescale_image); tiap
+    frame hanya mengambil sampel baris & kolom jendela tengah dengan numpy, bukan resize
+    penuh per frame. Piksel dimuat lewat load_zoomed_array (LRU 1), jadi hanya gambar
+    yang sedang tampil yang tersimpan di memori selama render.
+    """
+    zoomed_path = prescale_image(image_path, zoom)
+    # Hanya header yang dibaca di sini; piksel dimuat saat frame pertama klip dibutuhkan.
+    with Image.open(zoomed_path) as img:
+        big_w, big_h = img.size
+    w, h = round(big_w / (1 + zoom)), round(big_h / (1 + zoom))
+    offsets_x = np.arange(w) - (w - 1) / 2
+    offsets_y = np.arange(h) - (h - 1) / 2
 
-        except requests.exceptions.RequestException as e:
-            print(f"[WARN] Percobaan {attempt + 1} gagal: {e}")
-            if attempt < MAX_RETRIES - 1:
-                print("[INFO] Mencoba lagi dalam 3 detik...")
-                time.sleep(3) # Jeda sebelum mencoba lagi
+    def make_frame(t):
+        ratio = (1 + zoom) / (1 + zoom * (t / duration))
+        xs = np.clip(np.rint(offsets_x * ratio + (big_w - 1) / 2), 0, big_w - 1).astype(np.intp)
+        ys = np.clip(np.rint(offsets_y * ratio + (big_h - 1) / 2), 0, big_h - 1).astype(np.intp)
+        # Dua pengambilan 1-D (baris lalu kolom) jauh lebih murah daripada indeks 2-D.
+        return load_zoomed_array(zoomed_path).take(ys, axis=0).take(xs, axis=1)
+
+    return VideoClip(make_frame, duration=duration)
+
+
+def build_karaoke_captions(whisper_segments, font_path, size, color, width_px):
+    """Caption karaoke per kata sebagai (array RGBA, mulai, durasi) dari output Whisper.
+
+    Tiap kalimat hanya dirender sekali; sorotan per kata dibuat dengan menyembunyikan
+    (alpha 0) bagian kalimat setelah kata tersebut, baris demi baris.
+    """
+    font = load_font(font_path, size)
+    draw_kwargs = {"font": font, "anchor": "ma", "spacing": size // 4, "align": "center"}
+    measure = ImageDraw.Draw(Image.new("RGBA", (1, 1)))
+    captions = []
+    for seg_info in whisper_segments:
+        words = seg_info.get("words", [])
+        if not words:
+            continue
+        sentence = " ".join(word_info["word"].strip() for word_info in words)
+        caption = render_caption(sentence, font_path, size, color, width_px)
+        lines = wrap_text(sentence, font_path, size, width_px)
+        # Batas bawah tiap baris dan batas kanan tiap kata, mengikuti tata letak render_caption.
+        row_bottoms = [int(np.ceil(measure.multiline_textbbox((width_px / 2, 0), "\n".join(lines[:row + 1]), **draw_kwargs)[3])) for row in range(len(lines))]
+        word_ends = []
+        for row, line in enumerate(lines):
+            left = (width_px - text_length(font_path, size, line)) / 2
+            line_words = line.split(" ")
+            word_ends += [(row, int(np.ceil(left + text_length(font_path, size, " ".join(line_words[:j + 1]))))) for j in range(len(line_words))]
+
+        revealed_count = 0
+        for word_info in words:
+            revealed_count += len(word_info["word"].split())
+            revealed = caption.copy()
+            if revealed_count:
+                row, x_end = word_ends[revealed_count - 1]
+                top = row_bottoms[row - 1] if row else 0
+                revealed[top:row_bottoms[row], x_end:, 3] = 0
+                revealed[row_bottoms[row]:, :, 3] = 0
             else:
-                print(f"[ERROR] Gagal total mengunduh {destination.name} setelah {MAX_RETRIES} percobaan.")
-                return False # Gagal total setelah semua percobaan
+                revealed[..., 3] = 0
+            captions.append((revealed, word_info["start"], word_info["end"] - word_info["start"]))
+    return captions
+
+
+def build_caption_track(entries, work_dir, frame_size, position, total_duration):
+    """Menyimpan subtitle sebagai PNG transparan seukuran frame; hasilnya playlist [(file, durasi)].
+
+    Tiap (array RGBA, mulai, selesai) ditempel ke kanvas seukuran frame, jadi subtitle
+    cukup satu input dan satu filter overlay, dan tidak bergantung pada filter
+    drawtext (tidak tersedia di build ffmpeg bawaan imageio).
+    """
+    frame_w, frame_h = frame_size
+    x_pos, y_pos = SUBTITLE_POSITIONS.get(position, SUBTITLE_POSITIONS['bottom'])
+    Image.new("RGBA", frame_size, (0, 0, 0, 0)).save(work_dir / "blank.png")
+    playlist = []
+    cursor = 0.0
+    for index, (caption, start, end) in enumerate(entries):
+        start, end = max(PADDING_DURATION + start, cursor), PADDING_DURATION + end
+        if end <= start:
+            continue
+        if start > cursor:
+            playlist.append(("blank.png", start - cursor))
+        caption = Image.fromarray(caption)
+        canvas = Image.new("RGBA", frame_size, (0, 0, 0, 0))
+        top = (frame_h - caption.height) // 2 if y_pos == 'center' else int(frame_h * y_pos)
+        canvas.paste(caption, ((frame_w - caption.width) // 2, top))
+        file_name = f"caption_{index:04d}.png"
+        canvas.save(work_dir / file_name, compress_level=1)
+        playlist.append((file_name, end - start))
+        cursor = end
+    playlist.append(("blank.png", max(total_duration - cursor, 1 / VIDEO_FPS)))
+    return playlist
+
+
+def write_caption_track(playlist, start, end, track_path):
+    """Menulis potongan [start, end) dari playlist subtitle sebagai file ffconcat."""
+    entries = []
+    cursor = 0.0
+    for file_name, duration in playlist:
+        clip_start, clip_end = max(cursor, start), min(cursor + duration, end)
+        if clip_end - clip_start > 1e-6:
+            entries.append((file_name, clip_end - clip_start))
+        cursor += duration
+    with open(track_path, "w", encoding="utf-8") as f:
+        f.write("ffconcat version 1.0\n")
+        for file_name, duration in entries:
+            f.write(f"file '{file_name}'\nduration {duration:.3f}\n")
+        # Entri terakhir diulang agar durasinya dihormati oleh concat demuxer.
+        f.write(f"file '{entries[-1][0]}'\n")
+    return track_path
+
+
+def get_output_path(story_data, args):
+    """Path file video output (dari --output_path atau judul cerita); direktori induk dibuat bila perlu."""
+    output_filename = Path(args.output_path) if args.output_path else Path(f"{slugify(story_data.get('title', 'untitled-video'))}.mp4")
+    output_filename.parent.mkdir(parents=True, exist_ok=True)
+    return output_filename
+
+
+def get_music_path(args):
+    """Path musik latar jika diberikan dan file-nya ada."""
+    if not args.music:
+        return None
+    if not Path(args.music).is_file():
+        print(f"[WARN] File musik tidak ditemukan: {args.music}")
+        return None
+    print("[INFO] Musik latar ditambahkan.")
+    return args.music
+
+
+def print_video_ready(output_filename):
+    print(f"\n{SEPARATOR}")
+    print(f"🎉 [SUCCESS] Video berhasil dibuat! 🎉")
+    print(f"   > Lokasi File: {output_filename.resolve()}")
+    print(f"{SEPARATOR}")
 
-    return False # Seharusnya tidak pernah tercapai, tapi sebagai pengaman
+
+def get_encoder_settings(codec, preset=None, subtitle_type="standard"):
+    """Memilih preset dan parameter ffmpeg tambahan untuk codec (libx264/h264_nvenc)."""
+    # Frame dihasilkan berurutan dengan fps tetap; paksa CFR agar ffmpeg tidak menganalisis VFR.
+    common_params = ["-vsync", "cfr", "-movflags", "+faststart"]
+    if codec == "h264_nvenc":
+        # Preset NVENC baru (p1-p7); konten slideshow cukup dengan p4 tanpa B-frame.
+        # MoviePy hanya menambahkan -pix_fmt yuv420p untuk libx264, jadi diset manual di sini.
+        return {"codec": "h264_nvenc", "preset": preset or "p4", "ffmpeg_params": ["-tune", "ll", "-rc", "vbr", "-cq", "23", "-bf", "0", "-g", "240", "-pix_fmt", "yuv420p"] + common_params}
+    # Gambar diam + zoom pelan cocok dengan tune stillimage; subtitle karaoke (Whisper)
+    # berganti tiap kata sehingga tepi teks lebih terjaga dengan tune film.
+    # Keyframe tetap tiap 2 detik tanpa deteksi scene cut: seek murah, tanpa analisis ekstra.
+    tune = "film" if subtitle_type == "whisper" else "stillimage"
+    x264_params = f"keyint={2 * VIDEO_FPS}:min-keyint={2 * VIDEO_FPS}:no-scenecut=1"
+    return {"codec": "libx264", "preset": preset or "veryfast", "ffmpeg_params": ["-tune", tune, "-x264-params", x264_params] + common_params}
+
+
+def get_render_jobs(args, codec):
+    """Menentukan jumlah proses render paralel dari --render_jobs atau jumlah core CPU."""
+    if args.render_jobs:
+        return args.render_jobs
+    jobs = os.cpu_count() or 1
+    # GPU konsumen membatasi jumlah sesi NVENC yang boleh berjalan bersamaan.
+    return min(jobs, 3) if codec == "h264_nvenc" else jobs
+
+
+# State render untuk worker hasil fork; klip MoviePy (berisi closure) tidak bisa di-pickle.
+_RENDER_JOB = {}
+
+
+def _render_chunk(index):
+    """Worker: merender satu potongan timeline ke file MP4 tanpa audio."""
+    start, end = _RENDER_JOB["bounds"][index]
+    part_path = _RENDER_JOB["parts"][index]
+    _RENDER_JOB["clip"].subclip(start, end).write_videofile(str(part_path), audio=False, fps=VIDEO_FPS, threads=_RENDER_JOB["threads"], logger=None, **_RENDER_JOB["encoder"])
+    print(f"[INFO] Potongan {index + 1}/{len(_RENDER_JOB['parts'])} selesai dirender.")
+    return part_path
+
+
+def concat_videos(part_paths, output_path):
+    """Menggabungkan beberapa MP4 dengan codec identik memakai concat demuxer ffmpeg (tanpa encode ulang)."""
+    list_path = output_path.with_name(f"{output_path.stem}.concat.txt")
+    with open(list_path, "w", encoding="utf-8") as f:
+        for part_path in part_paths:
+            escaped = str(Path(part_path).resolve()).replace("'", "'\\''")
+            f.write(f"file '{escaped}'\n")
+    command = [get_setting("FFMPEG_BINARY"), "-y", "-loglevel", "error", "-f", "concat", "-safe", "0", "-i", str(list_path), "-c", "copy", str(output_path)]
+    try:
+        subprocess.run(command, check=True, capture_output=True, text=True)
+    finally:
+        list_path.unlink(missing_ok=True)
+
+
+def render_video(clip, output_path, encoder, split_points, jobs):
+    """Merender klip tanpa audio, dipecah di split_points dan dirender paralel jika jobs > 1."""
+    # Batas dibulatkan ke frame agar jumlah frame tiap potongan persis sama dengan render tunggal.
+    points = sorted({round(p * VIDEO_FPS) / VIDEO_FPS for p in split_points if 0 < p < clip.duration})
+    bounds = list(zip([0] + points, points + [clip.duration]))
+    if jobs <= 1 or len(bounds) <= 1 or "fork" not in multiprocessing.get_all_start_methods():
+        clip.write_videofile(str(output_path), audio=False, fps=VIDEO_FPS, threads=os.cpu_count(), **encoder)
+        return
+
+    jobs = min(jobs, len(bounds))
+    parts_dir = output_path.with_name(f"{output_path.stem}.parts")
+    parts_dir.mkdir(parents=True, exist_ok=True)
+    # Potongan selain yang terakhir dipendekkan setengah frame agar frame batas tidak terduplikasi.
+    half_frame = 0.5 / VIDEO_FPS
+    _RENDER_JOB.update(
+        clip=clip,
+        bounds=[(start, end - half_frame) for start, end in bounds[:-1]] + [bounds[-1]],
+        parts=[parts_dir / f"part_{i:03d}.mp4" for i in range(len(bounds))],
+        encoder=encoder,
+        threads=max(1, (os.cpu_count() or 1) // jobs),
+    )
+    try:
+        print(f"[INFO] Merender {len(bounds)} potongan video dengan {jobs} proses paralel...")
+        with multiprocessing.get_context("fork").Pool(processes=jobs) as pool:
+            part_paths = pool.map(_render_chunk, range(len(bounds)))
+        concat_videos(part_paths, output_path)
+    finally:
+        _RENDER_JOB.clear()
+        shutil.rmtree(parts_dir, ignore_errors=True)
+
+
+def build_audio_filter(narration_stream, music_stream, narration_offset):
+    """Graf filter audio ffmpeg: narasi digeser narration_offset detik, dicampur musik latar (opsional) -> [audio]."""
+    delay_ms = int(narration_offset * 1000)
+    if music_stream:
+        # amix membagi volume dengan jumlah input; volume=2 mengembalikannya ke penjumlahan biasa.
+        return f"[{narration_stream}]adelay={delay_ms}|{delay_ms},apad[narration];[{music_stream}]volume={MUSIC_VOLUME}[music];[narration][music]amix=inputs=2:duration=first,volume=2[audio]"
+    return f"[{narration_stream}]adelay={delay_ms}|{delay_ms},apad[audio]"
+
+
+def mux_audio(video_path, narration_path, music_path, narration_offset, duration, output_path):
+    """Menambahkan narasi (dan musik latar) ke video dengan ffmpeg tanpa encode ulang video."""
+    command = [get_setting("FFMPEG_BINARY"), "-y", "-loglevel", "error", "-i", str(video_path), "-i", str(narration_path)]
+    if music_path:
+        command += ["-stream_loop", "-1", "-i", str(music_path)]
+    audio_filter = build_audio_filter("1:a", "2:a" if music_path else None, narration_offset)
+    command += ["-filter_complex", audio_filter, "-map", "0:v", "-map", "[audio]", "-c:v", "copy", "-c:a", "aac", "-t", f"{duration:.3f}", "-movflags", "+faststart", str(output_path)]
+    try:
+        print("[>] Menggabungkan audio ke video dengan ffmpeg...")
+        subprocess.run(command, check=True, capture_output=True, text=True)
+        return True
+    except (FileNotFoundError, subprocess.CalledProcessError) as e:
+        if music_path:
+            # File musik ada tapi tidak bisa didekode: lanjutkan tanpa musik, bukan gagal total.
+            print(f"[WARN] Gagal memproses musik latar ({music_path}), melanjutkan tanpa musik: {(getattr(e, 'stderr', None) or str(e)).strip()}")
+            return mux_audio(video_path, narration_path, None, narration_offset, duration, output_path)
+        print(f"[ERROR] Gagal menggabungkan audio: {e}")
+        if getattr(e, "stderr", None):
+            print(e.stderr)
+        return False
+
+
+def convert_to_whisper_wav(audio_path, log=print):
+    """Mengonversi audio ke WAV 16kHz mono (format internal Whisper), di-cache di samping file asli."""
+    audio_path = Path(audio_path)
+    wav_path = audio_path.with_suffix(".wav")
+    if wav_path.exists():
+        return wav_path
+    command = [get_setting("FFMPEG_BINARY"), "-y", "-loglevel", "error", "-i", str(audio_path), "-ac", "1", "-ar", "16000", "-c:a", "pcm_s16le", str(wav_path)]
+    try:
+        log("[>] Mengonversi narasi ke WAV 16kHz mono untuk Whisper...")
+        subprocess.run(command, check=True, capture_output=True, text=True)
+        return wav_path
+    except (FileNotFoundError, subprocess.CalledProcessError) as e:
+        log(f"[WARN] Gagal mengonversi audio, Whisper akan memakai file asli: {e}")
+        wav_path.unlink(missing_ok=True)
+        return audio_path
+
+
+class DeferredConsole:
+    """Pengganti print untuk thread latar: output ditahan sampai release() dipanggil.
+
+    Selama ditahan, baris progres (end="") hanya disimpan yang terakhir, jadi log
+    thread latar tidak bercampur dengan log unduhan di thread utama.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._pending = []
+        self._released = False
+
+    def __call__(self, *args, **kwargs):
+        with self._lock:
+            if self._released:
+                print(*args, **kwargs)
+                return
+            if kwargs.get("end") == "" and self._pending and self._pending[-1][1].get("end") == "":
+                self._pending[-1] = (args, kwargs)
+            else:
+                self._pending.append((args, kwargs))
+
+    def release(self):
+        """Menampilkan output yang tertahan; output berikutnya langsung dicetak."""
+        with self._lock:
+            for args, kwargs in self._pending:
+                print(*args, **kwargs)
+            self._pending = []
+            self._released = True
+
+
+# Proses Whisper yang sedang berjalan, agar bisa dihentikan bila run dibatalkan
+# (mis. unduhan gambar gagal) tanpa menunggu transkripsi selesai.
+_WHISPER_LOCK = threading.Lock()
+_WHISPER_PROCS = set()
+_WHISPER_CANCELLED = threading.Event()
+
+
+def stop_whisper():
+    """Menghentikan Whisper yang sedang berjalan dan mencegah percobaan berikutnya dimulai."""
+    with _WHISPER_LOCK:
+        _WHISPER_CANCELLED.set()
+        for proc in _WHISPER_PROCS:
+            proc.terminate()
+
+
+def run_whisper_command(command, log=print):
+    """Menjalankan Whisper CLI sambil menampilkan progres (stderr) secara langsung."""
+    # Hanya ekor log yang disimpan untuk pesan error; progres bisa ribuan baris.
+    error_lines = deque(maxlen=50)
+    with _WHISPER_LOCK:
+        if _WHISPER_CANCELLED.is_set():
+            raise subprocess.CalledProcessError(-1, command, stderr="Dibatalkan.")
+        proc = subprocess.Popen(command, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True, bufsize=1 << 20)
+        _WHISPER_PROCS.add(proc)
+    try:
+        with proc:
+            # text=True menerjemahkan '\r' dari progress bar menjadi baris baru.
+            for line in proc.stderr:
+                line = line.rstrip()
+                if line:
+                    log(f"\r    {line}", end="", flush=True)
+                    error_lines.append(line)
+    finally:
+        with _WHISPER_LOCK:
+            _WHISPER_PROCS.discard(proc)
+    log()
+    if proc.returncode:
+        raise subprocess.CalledProcessError(proc.returncode, command, stderr="\n".join(error_lines))
 
 
 # --- FUNGSI ALUR KERJA UTAMA ---
@@ -115,19 +634,17 @@ def generate_story_from_topic(topic, cache_path):
     story_json_path = cache_path / "story.json"
     if story_json_path.exists():
         print("[INFO] Menggunakan cerita dari cache.")
-        with open(story_json_path, "r", encoding="utf-8") as f:
-            return json.load(f)
+        return load_json(story_json_path)
             
     prompt_template = f'You are an expert multilingual storyteller AI. A user has provided a story topic. Your task is to generate a short story script based on this topic. The user\'s topic is: "{topic}". You MUST adhere to the following rules: 1. Detect the language of the user\'s topic. 2. The \'title\' and all \'voice_prompt\' values in your response MUST be in the same language as the user\'s topic. 3. The \'image_prompt\' values MUST be in English and be highly descriptive for a text-to-image AI. 4. The output MUST be a single, valid JSON object. 5. The JSON structure must be: {{"title": "A story title", "lang": "id", "segments": [{{"voice_prompt": "A sentence for the narrator.", "image_prompt": "A descriptive English image prompt."}}, ...]}} 6. The story must contain exactly 5 segments. 7. The \'lang\' field MUST contain the appropriate two-letter language code for the detected language.'
     encoded_prompt = quote(prompt_template)
     url = URL_STORY.format(prompt=encoded_prompt)
     try:
         print("[INFO] Menghubungi AI untuk membuat cerita...")
-        response = requests.get(url)
+        response = SESSION.get(url, timeout=REQUEST_TIMEOUT)
         response.raise_for_status()
-        story_data = response.json()
-        with open(story_json_path, "w", encoding="utf-8") as f:
-            json.dump(story_data, f, ensure_ascii=False, indent=4)
+        story_data = parse_json(response.content)
+        save_json(story_json_path, story_data)
         print(f"[SUCCESS] Cerita berhasil dibuat: '{story_data.get('title', 'Tanpa Judul')}'")
         return story_data
     except (requests.exceptions.RequestException, json.JSONDecodeError) as e:
@@ -135,80 +652,113 @@ def generate_story_from_topic(topic, cache_path):
         sys.exit(1)
 
 
-def download_all_assets(story_data, seed, cache_paths):
+def download_all_assets(story_data, seed, cache_paths, executor, on_audio_ready=None):
+    """Mengunduh gambar & narasi lewat executor; on_audio_ready(path) dipanggil begitu narasi tersedia."""
     print(f"\n{SEPARATOR}\n[LANGKAH 2/5] Mengunduh Aset\n{SEPARATOR}")
     segments = story_data.get("segments", [])
+
+    # Audio narasi (TTS) biasanya permintaan paling lama, jadi dimasukkan paling
+    # depan agar langsung berjalan walau jumlah segmen melebihi jumlah worker.
+    combined_voice_prompt = " ".join([seg["voice_prompt"] for seg in segments])
+    audio_prompt = f"Use a storyteller tone and read the following text exactly as it is, without any changes: {combined_voice_prompt}"
+    encoded_audio_prompt = quote(audio_prompt)
+    audio_url = URL_AUDIO.format(prompt=encoded_audio_prompt)
+    audio_dest = cache_paths["audio"] / f"{cache_key(audio_url)}.mp3"
+    tasks = [(download_file, audio_url, audio_dest)]
+
     image_paths = []
     for i, segment in enumerate(segments):
         image_prompt = segment.get("image_prompt", "a blank white background")
         encoded_prompt = quote(image_prompt)
         url = URL_IMAGE.format(prompt=encoded_prompt, seed=seed)
-        image_dest = cache_paths["images"] / f"image_{i+1}.jpg"
-        if not download_file(url, image_dest):
-             print(f"[FATAL] Proses dihentikan karena gagal mengunduh aset.")
-             sys.exit(1)
+        image_dest = cache_paths["images"] / f"{cache_key(url)}.jpg"
+        # Segmen dengan prompt yang sama memakai file yang sama; cukup diunduh sekali.
+        if str(image_dest) not in image_paths:
+            tasks.append((download_image, url, image_dest))
         image_paths.append(str(image_dest))
-    
-    print("[INFO] Semua aset gambar berhasil diunduh.")
 
-    combined_voice_prompt = " ".join([seg["voice_prompt"] for seg in segments])
-    audio_prompt = f"Use a storyteller tone and read the following text exactly as it is, without any changes: {combined_voice_prompt}"
-    encoded_audio_prompt = quote(audio_prompt)
-    audio_url = URL_AUDIO.format(prompt=encoded_audio_prompt)
-    audio_dest = cache_paths["audio"] / "narration.mp3"
-    if not download_file(audio_url, audio_dest):
-        print("[FATAL] Proses dihentikan karena gagal mengunduh audio narasi.")
-        sys.exit(1)
+    # Unduh semua gambar dan audio narasi secara paralel. Jika satu gagal, unduhan
+    # yang belum mulai dibatalkan; yang sedang berjalan tetap selesai dan ter-cache.
+    print(f"[INFO] Mengunduh {len(tasks)} aset secara paralel...")
+    futures = {executor.submit(task, url, dest): dest for task, url, dest in tasks}
+    for future in as_completed(futures):
+        dest = futures[future]
+        if not future.result():
+            for pending in futures:
+                pending.cancel()
+            print(f"[FATAL] Proses dihentikan karena gagal mengunduh aset: {dest.name}")
+            sys.exit(1)
+        if dest == audio_dest and on_audio_ready:
+            on_audio_ready(str(audio_dest))
     
     print("[SUCCESS] Semua aset berhasil diunduh.")
     return {"images": image_paths, "audio": str(audio_dest)}
 
 
-def generate_subtitles(use_whisper, audio_path, story_data, cache_paths, whisper_executable_path, use_gpu):
-    print(f"\n{SEPARATOR}\n[LANGKAH 3/5] Membuat Subtitle\n{SEPARATOR}")
+def generate_subtitles(use_whisper, audio_path, story_data, cache_paths, whisper_executable_path, use_gpu, log=print):
+    """Membuat data subtitle (Whisper per-kata atau standar per segmen); output lewat log."""
     if use_whisper:
-        print("[INFO] Mode subtitle per-kata (Whisper) dipilih.")
+        log("[INFO] Mode subtitle per-kata (Whisper) dipilih.")
         if use_gpu:
-            print("[INFO] Opsi --use_gpu aktif. Whisper akan otomatis menggunakan GPU jika instalasi PyTorch mendukung CUDA.")
+            log("[INFO] Opsi --use_gpu aktif. Whisper akan dijalankan dengan --device cuda (fallback ke CPU jika gagal).")
         audio_file = Path(audio_path)
         expected_json_output = cache_paths["subtitles"] / f"{audio_file.stem}.json"
         if expected_json_output.exists():
-            print(f"[INFO] Menggunakan transkripsi Whisper dari cache.")
-            with open(expected_json_output, "r", encoding="utf-8") as f:
-                return {"type": "whisper", "data": json.load(f)}
-        command = [whisper_executable_path, str(audio_file), "--model", "base", "--word_timestamps", "True", "--output_format", "json", "--output_dir", str(cache_paths["subtitles"])]
+            log(f"[INFO] Menggunakan transkripsi Whisper dari cache.")
+            return {"type": "whisper", "data": load_json(expected_json_output)}
+        whisper_input = convert_to_whisper_wav(audio_file, log)
+        command = [whisper_executable_path, str(whisper_input), "--model", "base", "--word_timestamps", "True", "--output_format", "json", "--output_dir", str(cache_paths["subtitles"]), "--verbose", "False"]
         lang_code = story_data.get("lang")
         if lang_code:
-            print(f"[INFO] Menambahkan parameter bahasa untuk Whisper: --language {lang_code}")
+            log(f"[INFO] Menambahkan parameter bahasa untuk Whisper: --language {lang_code}")
             command.extend(["--language", lang_code])
         else:
-            print("[WARN] Kode bahasa ('lang') tidak ditemukan. Whisper akan deteksi otomatis.")
-        try:
-            print(f"[>] Menjalankan perintah Whisper CLI...")
-            subprocess.run(command, check=True, capture_output=True, text=True)
-            print("[SUCCESS] Transkripsi Whisper berhasil dibuat.")
-            with open(expected_json_output, "r", encoding="utf-8") as f:
-                return {"type": "whisper", "data": json.load(f)}
-        except (FileNotFoundError, subprocess.CalledProcessError) as e:
-            print(f"[ERROR] Gagal saat menjalankan Whisper: {e}")
-            print("[INFO] Beralih ke metode subtitle standar.")
-            return generate_subtitles(False, audio_path, story_data, cache_paths, whisper_executable_path, use_gpu)
+            log("[WARN] Kode bahasa ('lang') tidak ditemukan. Whisper akan deteksi otomatis.")
+        # Whisper tidak memakai GPU kecuali diminta eksplisit; jika inisialisasi CUDA
+        # gagal (mis. runtime tidak cocok), coba lagi di CPU sebelum menyerah.
+        device_commands = []
+        if use_gpu:
+            device_commands.append(("cuda", command + ["--device", "cuda", "--fp16", "True"]))
+        device_commands.append(("cpu", command + ["--device", "cpu", "--fp16", "False", "--threads", str(os.cpu_count())]))
+        for device, device_command in device_commands:
+            try:
+                log(f"[>] Menjalankan perintah Whisper CLI (device: {device})...")
+                run_whisper_command(device_command, log)
+            except FileNotFoundError as e:
+                log(f"[ERROR] Whisper CLI tidak ditemukan: {e}")
+                break
+            except subprocess.CalledProcessError as e:
+                if _WHISPER_CANCELLED.is_set():
+                    return None
+                log(f"[ERROR] Gagal saat menjalankan Whisper ({device}): {e}")
+                continue
+            if expected_json_output.exists():
+                log("[SUCCESS] Transkripsi Whisper berhasil dibuat.")
+                return {"type": "whisper", "data": load_json(expected_json_output)}
+            # Keluar dengan kode 0 tapi tanpa output: perlakukan seperti run yang gagal.
+            log(f"[ERROR] Whisper ({device}) selesai tanpa menulis transkripsi: {expected_json_output}")
+        log("[INFO] Beralih ke metode subtitle standar.")
+        return generate_subtitles(False, audio_path, story_data, cache_paths, whisper_executable_path, use_gpu, log)
     else:
-        print("[INFO] Mode subtitle standar (per segmen) dipilih.")
+        log("[INFO] Mode subtitle standar (per segmen) dipilih.")
         return {"type": "standard", "data": story_data["segments"]}
 
 
 def create_final_video(story_data, assets, subtitles, args):
     print(f"\n{SEPARATOR}\n[LANGKAH 4/5] Mengkompilasi Klip Video\n{SEPARATOR}")
     
-    PADDING_DURATION = 5
     print(f"[INFO] Menambahkan padding {PADDING_DURATION} detik di awal dan akhir video.")
 
-    POSITIONS = {'bottom': ('center', 0.8), 'center': ('center', 'center'), 'top': ('center', 0.1)}
-    subtitle_pos = POSITIONS.get(args.subtitle_position, ('center', 0.8))
+    subtitle_pos = SUBTITLE_POSITIONS.get(args.subtitle_position, SUBTITLE_POSITIONS['bottom'])
 
     narration_audio = AudioFileClip(assets["audio"])
-    raw_image_clips = [ImageClip(path) for path in assets["images"]]
+    image_paths = assets["images"]
+
+    # --- Buat Klip Padding ---
+    # Dibangun langsung dari array gambar agar tidak berbagi state dengan klip utama.
+    intro_clip = ImageClip(load_image_array(image_paths[0]), duration=PADDING_DURATION).fadein(1)
+    outro_clip = ImageClip(load_image_array(image_paths[-1]), duration=PADDING_DURATION).fadeout(1)
+    w, h = intro_clip.size
 
     # --- Buat klip visual utama ---
     if subtitles["type"] == "whisper":
@@ -217,83 +767,153 @@ def create_final_video(story_data, assets, subtitles, args):
             print("[ERROR] Output Whisper tidak mengandung 'segments'. Tidak bisa melanjutkan.")
             sys.exit(1)
         total_visual_duration = whisper_segments[-1]["end"]
-        image_duration = total_visual_duration / len(raw_image_clips)
-        video_clips = [img.resize(lambda t: 1 + 0.2 * (t / image_duration)).set_position("center", "center").set_duration(image_duration) for img in raw_image_clips]
-        main_visual_track = concatenate_videoclips(video_clips, method="compose")
-        all_subtitle_clips = []
-        for seg_info in whisper_segments:
-            w, h = main_visual_track.size
-            if "words" in seg_info:
-                for word_info in seg_info["words"]:
-                    highlighted_sentence = " ".join([w["word"].strip() for w in seg_info["words"] if w['start'] <= word_info['start']])
-                    hl_clip = TextClip(highlighted_sentence, fontsize=args.font_size, font=args.font_path, color=args.highlight_color, method="caption", size=(w * 0.9, None), align="Center").set_position(subtitle_pos, relative=True).set_start(word_info["start"]).set_duration(word_info["end"] - word_info["start"])
-                    all_subtitle_clips.append(hl_clip)
-        main_visual_track = CompositeVideoClip([main_visual_track] + all_subtitle_clips)
+        image_duration = total_visual_duration / len(image_paths)
+        video_clips = [make_ken_burns_clip(path, image_duration) for path in image_paths]
+        visual_track = concatenate_videoclips(video_clips, method="chain")
+        word_captions = build_karaoke_captions(whisper_segments, args.font_path, args.font_size, args.highlight_color, int(w * 0.9))
+        all_subtitle_clips = [ImageClip(caption, transparent=True).set_position(subtitle_pos, relative=True).set_start(start).set_duration(duration) for caption, start, duration in word_captions]
     else: # Mode Standar
-        avg_duration = narration_audio.duration / len(raw_image_clips)
-        processed_clips = []
-        for i, img_clip in enumerate(raw_image_clips):
-            w, h = img_clip.size
-            animated_clip = img_clip.resize(lambda t: 1 + 0.2 * (t / avg_duration)).set_position("center", "center").set_duration(avg_duration)
+        avg_duration = narration_audio.duration / len(image_paths)
+        video_clips = []
+        all_subtitle_clips = []
+        for i, path in enumerate(image_paths):
+            animated_clip = make_ken_burns_clip(path, avg_duration)
             text = subtitles["data"][i]["voice_prompt"]
-            txt_clip = TextClip(text, fontsize=args.font_size, font=args.font_path, color=args.font_color, stroke_color="black", stroke_width=1.5, method="caption", size=(w * 0.9, None), align="Center").set_position(subtitle_pos, relative=True).set_duration(avg_duration)
-            segment_video = CompositeVideoClip([animated_clip, txt_clip], size=img_clip.size)
-            if processed_clips:
-                segment_video = segment_video.fadein(1)
-            processed_clips.append(segment_video)
-        main_visual_track = concatenate_videoclips(processed_clips)
+            txt_clip = make_text_clip(text, args.font_size, args.font_path, args.font_color, w * 0.9, "black", 1.5).set_position(subtitle_pos, relative=True).set_start(i * avg_duration).set_duration(avg_duration)
+            if video_clips:
+                animated_clip = animated_clip.fadein(1)
+                txt_clip = txt_clip.crossfadein(1)
+            video_clips.append(animated_clip)
+            all_subtitle_clips.append(txt_clip)
+        visual_track = concatenate_videoclips(video_clips, method="chain")
+
+    # Semua subtitle ditumpuk dalam satu komposit di atas seluruh timeline,
+    # bukan satu CompositeVideoClip per segmen yang lalu digabung.
+    main_visual_track = CompositeVideoClip([visual_track] + all_subtitle_clips)
 
-    # --- Buat Klip Padding ---
-    intro_clip = raw_image_clips[0].set_duration(PADDING_DURATION).fadein(1)
-    outro_clip = raw_image_clips[-1].set_duration(PADDING_DURATION).fadeout(1)
-    
     # --- Gabungkan semua klip visual ---
     final_visual_track = concatenate_videoclips([intro_clip, main_visual_track, outro_clip])
+    # Batas alami timeline (intro | tiap segmen gambar | outro) untuk render paralel.
+    segment_duration = main_visual_track.duration / len(image_paths)
+    split_points = [PADDING_DURATION + i * segment_duration for i in range(len(image_paths) + 1)]
     
     print(f"\n{SEPARATOR}\n[LANGKAH 5/5] Finalisasi Audio & Ekspor Video\n{SEPARATOR}")
     
-    # --- Atur Audio ---
-    narration_audio = narration_audio.set_start(PADDING_DURATION)
-    
-    final_audio_clips = [narration_audio]
-    if args.music:
-        try:
-            music_clip = AudioFileClip(args.music).volumex(0.15)
-            looped_music = afx.audio_loop(music_clip, duration=final_visual_track.duration)
-            final_audio_clips.append(looped_music)
-            print("[INFO] Musik latar ditambahkan.")
-        except Exception as e:
-            print(f"[WARN] Gagal memuat atau memproses file musik: {e}")
-    
-    final_audio = CompositeAudioClip(final_audio_clips)
-    
-    # PERBAIKAN: Secara eksplisit set durasi audio agar sama dengan video
-    final_audio = final_audio.set_duration(final_visual_track.duration)
-
-    final_video = final_visual_track.set_audio(final_audio)
-
-    # --- Ekspor Video ---
-    output_filename = Path(args.output_path) if args.output_path else Path(f"{slugify(story_data.get('title', 'untitled-video'))}.mp4")
-    output_filename.parent.mkdir(parents=True, exist_ok=True)
-    video_codec = "h264_nvenc" if args.use_gpu else "libx264"
+    # --- Ekspor Video (tanpa audio) ---
+    output_filename = get_output_path(story_data, args)
+    video_only_path = output_filename.with_name(f"{output_filename.stem}.video-only.mp4")
+    final_video = final_visual_track
+    encoder = get_encoder_settings(args.codec, args.preset, subtitles["type"])
     try:
-        print(f"[>] Mengekspor video ke '{output_filename}' menggunakan codec: {video_codec}...")
-        final_video.write_videofile(str(output_filename), codec=video_codec, audio_codec="aac", preset="medium", fps=24, threads=8)
+        print(f"[>] Mengekspor video ke '{video_only_path}' menggunakan codec: {encoder['codec']} (preset {encoder['preset']})...")
+        render_video(final_video, video_only_path, encoder, split_points, get_render_jobs(args, encoder["codec"]))
     except Exception as e:
-        if args.use_gpu:
+        if encoder["codec"] == "h264_nvenc":
             print(f"[ERROR] Gagal encoding dengan GPU: {e}\n[INFO] Beralih ke encoding CPU (libx264)...")
-            final_video.write_videofile(str(output_filename), codec="libx264", audio_codec="aac", preset="medium", fps=24, threads=8)
+            render_video(final_video, video_only_path, get_encoder_settings("libx264", subtitle_type=subtitles["type"]), split_points, get_render_jobs(args, "libx264"))
         else:
             print(f"[ERROR] Gagal saat menulis file video: {e}")
             sys.exit(1)
+
+    # --- Gabungkan Audio ---
+    try:
+        muxed = mux_audio(video_only_path, assets["audio"], get_music_path(args), PADDING_DURATION, final_video.duration, output_filename)
+    finally:
+        video_only_path.unlink(missing_ok=True)
+    if not muxed:
+        sys.exit(1)
     
-    for clip in [narration_audio, final_video] + raw_image_clips:
+    for clip in [narration_audio, final_video]:
         if clip: clip.close()
     
-    print(f"\n{SEPARATOR}")
-    print(f"🎉 [SUCCESS] Video berhasil dibuat! 🎉")
-    print(f"   > Lokasi File: {output_filename.resolve()}")
-    print(f"{SEPARATOR}")
+    print_video_ready(output_filename)
+
+
+def create_final_video_ffmpeg(story_data, assets, subtitles, args):
+    """Jalur --fast_render: tiap bagian timeline dirender ffmpeg, digabung dengan concat demuxer, lalu audio di-mux."""
+    print(f"\n{SEPARATOR}\n[LANGKAH 4/5] Menyusun Bagian Video ffmpeg\n{SEPARATOR}")
+    print(f"[INFO] Menambahkan padding {PADDING_DURATION} detik di awal dan akhir video.")
+    image_paths = assets["images"]
+    with Image.open(image_paths[0]) as img:
+        w, h = img.size
+
+    if subtitles["type"] == "whisper":
+        whisper_segments = subtitles["data"].get("segments", [])
+        if not whisper_segments:
+            print("[ERROR] Output Whisper tidak mengandung 'segments'. Tidak bisa melanjutkan.")
+            sys.exit(1)
+        main_duration = whisper_segments[-1]["end"]
+        caption_entries = [(caption, start, start + duration) for caption, start, duration in build_karaoke_captions(whisper_segments, args.font_path, args.font_size, args.highlight_color, int(w * 0.9))]
+    else: # Mode Standar
+        narration_audio = AudioFileClip(assets["audio"])
+        main_duration = narration_audio.duration
+        narration_audio.close()
+        segment_duration = main_duration / len(image_paths)
+        caption_entries = [(render_caption(seg["voice_prompt"], args.font_path, args.font_size, args.font_color, int(w * 0.9), "black", 2), i * segment_duration, (i + 1) * segment_duration) for i, seg in enumerate(subtitles["data"][:len(image_paths)])]
+
+    output_filename = get_output_path(story_data, args)
+    work_dir = output_filename.with_name(f"{output_filename.stem}.ffmpeg")
+    work_dir.mkdir(parents=True, exist_ok=True)
+
+    segment_frames = round(main_duration / len(image_paths) * VIDEO_FPS)
+    padding_frames = PADDING_DURATION * VIDEO_FPS
+    total_duration = (2 * padding_frames + segment_frames * len(image_paths)) / VIDEO_FPS
+    caption_playlist = build_caption_track(caption_entries, work_dir, (w, h), args.subtitle_position, total_duration)
+
+    # --- Bagian timeline: (gambar, rantai filter gambar, rantai filter subtitle, jumlah frame) ---
+    pieces = [(image_paths[0], f"scale={w}:{h},zoompan=z=1:d={padding_frames}:s={w}x{h}:fps={VIDEO_FPS},fade=t=in:st=0:d=1", "null", padding_frames)]
+    for i, path in enumerate(image_paths):
+        # Sama dengan jalur MoviePy: hanya mode standar yang memakai fade antar segmen,
+        # dan subtitle segmen itu ikut muncul perlahan (crossfadein). Track PNG hanya punya
+        # satu frame per gambar, jadi diubah ke fps video dulu agar fade alpha bertahap.
+        fade = i and subtitles["type"] == "standard"
+        # Input diperbesar 2x dulu agar pembulatan posisi zoompan tidak membuat gambar bergetar.
+        chain = f"scale={2 * w}:{2 * h},zoompan=z='1+{KEN_BURNS_ZOOM}*on/{segment_frames}':x='iw/2-iw/zoom/2':y='ih/2-ih/zoom/2':d={segment_frames}:s={w}x{h}:fps={VIDEO_FPS}"
+        pieces.append((path, chain + (",fade=t=in:st=0:d=1" if fade else ""), f"fps={VIDEO_FPS},format=rgba,fade=t=in:st=0:d=1:alpha=1" if fade else "null", segment_frames))
+    pieces.append((image_paths[-1], f"scale={w}:{h},zoompan=z=1:d={padding_frames}:s={w}x{h}:fps={VIDEO_FPS},fade=t=out:st={PADDING_DURATION - 1}:d=1", "null", padding_frames))
+
+    piece_start = 0
+    for index, (_, _, _, frames) in enumerate(pieces):
+        write_caption_track(caption_playlist, piece_start / VIDEO_FPS, (piece_start + frames) / VIDEO_FPS, work_dir / f"captions_{index:03d}.ffconcat")
+        piece_start += frames
+
+    def render_piece(index, encoder):
+        image_path, chain, caption_chain, frames = pieces[index]
+        part_name = f"part_{index:03d}.mp4"
+        command = [get_setting("FFMPEG_BINARY"), "-y", "-loglevel", "error", "-i", str(Path(image_path).resolve()), "-f", "concat", "-safe", "0", "-i", f"captions_{index:03d}.ffconcat"]
+        command += ["-filter_complex", f"[0:v]{chain},setsar=1,format=yuv420p[v];[1:v]{caption_chain}[cap];[v][cap]overlay=0:0:format=auto,format=yuv420p[vout]", "-map", "[vout]", "-frames:v", str(frames)]
+        command += ["-c:v", encoder["codec"], "-preset", encoder["preset"]] + encoder["ffmpeg_params"] + ["-pix_fmt", "yuv420p", part_name]
+        subprocess.run(command, check=True, capture_output=True, text=True, cwd=work_dir)
+        return work_dir / part_name
+
+    print(f"\n{SEPARATOR}\n[LANGKAH 5/5] Render & Ekspor Video (ffmpeg)\n{SEPARATOR}")
+    video_only_path = work_dir / "video-only.mp4"
+
+    def encode(encoder):
+        # Tiap bagian di-encode terpisah (paralel), lalu digabung tanpa encode ulang.
+        print(f"[>] Mengekspor video ke '{output_filename}' menggunakan codec: {encoder['codec']} (preset {encoder['preset']})...")
+        with ThreadPoolExecutor(max_workers=get_render_jobs(args, encoder["codec"])) as executor:
+            part_paths = list(executor.map(lambda index: render_piece(index, encoder), range(len(pieces))))
+        concat_videos(part_paths, video_only_path)
+
+    encoder = get_encoder_settings(args.codec, args.preset, subtitles["type"])
+    try:
+        try:
+            encode(encoder)
+        except subprocess.CalledProcessError as e:
+            if encoder["codec"] != "h264_nvenc":
+                raise
+            print(f"[ERROR] Gagal encoding dengan GPU: {e.stderr.strip()}\n[INFO] Beralih ke encoding CPU (libx264)...")
+            encode(get_encoder_settings("libx264", subtitle_type=subtitles["type"]))
+        if not mux_audio(video_only_path, assets["audio"], get_music_path(args), PADDING_DURATION, total_duration, output_filename):
+            sys.exit(1)
+    except subprocess.CalledProcessError as e:
+        print(f"[ERROR] Gagal saat merender video dengan ffmpeg: {e.stderr.strip()}")
+        sys.exit(1)
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    print_video_ready(output_filename)
 
 
 def run_interactive_mode(defaults):
@@ -338,6 +958,14 @@ def run_interactive_mode(defaults):
     return defaults
 
 
+def positive_int(value):
+    """Tipe argparse untuk bilangan bulat >= 1."""
+    number = int(value)
+    if number < 1:
+        raise argparse.ArgumentTypeError(f"harus bilangan bulat >= 1, bukan {value}")
+    return number
+
+
 def main():
     parser = argparse.ArgumentParser(description="Generator Video Cerita Pendek Otomatis.", formatter_class=argparse.RawTextHelpFormatter)
     parser.add_argument("topic", nargs='?', default=None, help="Ide atau topik cerita. Opsional jika menggunakan mode interaktif.")
@@ -352,6 +980,10 @@ def main():
     parser.add_argument("--highlight_color", type=str, default="yellow", help="Warna highlight untuk subtitle mode Whisper.")
     parser.add_argument("--subtitle_position", type=str, default="bottom", choices=['top', 'center', 'bottom'], help="Posisi vertikal subtitle.")
     parser.add_argument("--output_path", type=str, default=None, help="Jalur file output untuk video (e.g., 'videos/hasil.mp4').")
+    parser.add_argument("--fast_render", action="store_true", help="Render tiap bagian video (intro, segmen, outro) dengan ffmpeg secara paralel, lalu gabungkan dengan concat demuxer dan tambahkan audio; frame tidak dibuat lewat MoviePy, jauh lebih cepat.")
+    parser.add_argument("--codec", type=str, default=None, choices=['libx264', 'h264_nvenc'], help="Codec video (default: h264_nvenc jika --use_gpu aktif, selain itu libx264).")
+    parser.add_argument("--preset", type=str, default=None, help="Preset encoder (default: 'p4' untuk NVENC, 'veryfast' untuk libx264).")
+    parser.add_argument("--render_jobs", type=positive_int, default=None, help="Jumlah proses render paralel (default: sesuai jumlah core CPU, 1 = tanpa paralel).")
     parser.add_argument("--whisper_path", type=str, default="whisper", help="Path ke file executable Whisper CLI.")
     args = parser.parse_args()
 
@@ -360,22 +992,57 @@ def main():
     
     if not args.topic:
         parser.error("[ERROR] Topik cerita dibutuhkan. Gunakan argumen posisi atau jalankan dengan flag -i/--interactive.")
+    if args.codec is None:
+        args.codec = "h264_nvenc" if args.use_gpu else "libx264"
 
     print("\n[INFO] Memulai Proses Pembuatan Video...")
     font_cache_dir = Path("cache") / "fonts"
     font_cache_dir.mkdir(parents=True, exist_ok=True)
     args.font_path = font_cache_dir / f"{args.font_id}.ttf"
-    if not download_file(URL_FONT.format(id=args.font_id), args.font_path):
-        sys.exit(1)
+    # Satu pool unduhan untuk seluruh run. Font baru dibutuhkan saat kompilasi video,
+    # jadi unduhannya berjalan di latar belakang bersamaan dengan pembuatan cerita dan aset.
+    download_executor = ThreadPoolExecutor(max_workers=DOWNLOAD_WORKERS)
+    font_future = download_executor.submit(download_file, URL_FONT.format(id=args.font_id), args.font_path)
 
     cache_paths = setup_cache_directories(args.topic)
     story_data = generate_story_from_topic(args.topic, cache_paths["base"])
     
+    # Whisper hanya butuh audio narasi, jadi transkripsi dimulai begitu narasi selesai
+    # diunduh, bersamaan dengan gambar yang masih diunduh. Output-nya ditahan sampai
+    # langkah 3 ditampilkan agar tidak bercampur dengan log unduhan.
+    subtitle_executor = ThreadPoolExecutor(max_workers=1)
+    subtitle_console = DeferredConsole()
+    subtitle_futures = []
+
+    def start_subtitles(audio_path):
+        subtitle_futures.append(subtitle_executor.submit(generate_subtitles, True, audio_path, story_data, cache_paths, args.whisper_path, args.use_gpu, subtitle_console))
+
     current_seed = DEFAULT_SEED if args.seed is None else args.seed
-    assets = download_all_assets(story_data, current_seed, cache_paths)
-    subtitles = generate_subtitles(args.use_whisper, assets["audio"], story_data, cache_paths, args.whisper_path, args.use_gpu)
-    
-    create_final_video(story_data, assets, subtitles, args)
+    try:
+        assets = download_all_assets(story_data, current_seed, cache_paths, download_executor, on_audio_ready=start_subtitles if args.use_whisper else None)
+    except BaseException:
+        # Unduhan gagal (sys.exit) atau dibatalkan: hentikan Whisper agar keluarnya
+        # proses tidak tertahan menunggu thread transkripsi selesai.
+        stop_whisper()
+        subtitle_executor.shutdown(wait=False, cancel_futures=True)
+        raise
+    if not font_future.result():
+        stop_whisper()
+        subtitle_executor.shutdown(wait=False, cancel_futures=True)
+        sys.exit(1)
+    download_executor.shutdown()
+
+    print(f"\n{SEPARATOR}\n[LANGKAH 3/5] Membuat Subtitle\n{SEPARATOR}")
+    if subtitle_futures:
+        subtitle_console.release()
+        subtitles = subtitle_futures[0].result()
+    else:
+        subtitles = generate_subtitles(False, assets["audio"], story_data, cache_paths, args.whisper_path, args.use_gpu)
+    subtitle_executor.shutdown()
+    if args.fast_render:
+        create_final_video_ffmpeg(story_data, assets, subtitles, args)
+    else:
+        create_final_video(story_data, assets, subtitles, args)
 
 
 if __name__ == "__main__":